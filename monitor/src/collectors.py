@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import Future, wait
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import errno
 import logging
 import os
-import socket
+import queue
+import re
+import stat
+import threading
+import time
 
 import psutil
 
@@ -35,90 +39,129 @@ _PSEUDO_FS_TYPES = {
     "debugfs",
     "securityfs",
 }
+_PSEUDO_FS_TYPES_BYTES = frozenset(fs_type.encode() for fs_type in _PSEUDO_FS_TYPES)
 
+_GIB_INV = 1.0 / (1 << 30)
 
-@dataclass(frozen=True)
-class DiskSnapshot:
-    device: str
-    mount_point: str
-    filesystem: str
-    total_gb: float
-    used_gb: float
-    free_gb: float
-    used_percent: float
+# Boot time is fixed for the lifetime of the process
+_BOOT_TIME = psutil.boot_time()
+_BOOT_TIME_ISO = datetime.fromtimestamp(_BOOT_TIME, tz=timezone.utc).isoformat()
+
+_CPU_MIN_WINDOW = 0.25
+
+# stat errors that Path.exists() treats as "missing"; such mounts are skipped quietly
+_MISSING_PATH_ERRNOS = frozenset({errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP})
+
+
+def _cpu_busy_total(times: NamedTuple) -> Tuple[float, float]:
+    # Same accounting as psutil.cpu_percent: guest time is already counted in user/nice
+    total = sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0)
+    idle = times.idle + getattr(times, "iowait", 0.0)
+    return total - idle, total
+
+
+# Our own CPU sample, shared by every scheduler thread; psutil's interval=None baseline is
+# kept per calling thread, so it cannot be primed once for heartbeats run on worker threads
+_cpu_lock = threading.Lock()
+_cpu_last_sample = _cpu_busy_total(psutil.cpu_times())
+_cpu_sampled_at = time.monotonic()
+
+_DISK_PROBE_WORKERS = 8
+_DISK_PROBE_TIMEOUT = 2.0
+
+# Long-lived daemon probe threads: a mount hung in stat/statvfs (e.g. a hard NFS mount) only
+# occupies one of them and never blocks interpreter exit the way concurrent.futures workers do
+_disk_probe_queue: queue.Queue[Tuple[str, Future]] = queue.Queue()
+_disk_probe_lock = threading.Lock()
+_disk_probe_threads: List[threading.Thread] = []
+# Probes still outstanding, keyed by path; later callers wait on them instead of resubmitting
+_disk_probe_pending: Dict[str, Future] = {}
+
+# Octal escapes the kernel applies to whitespace and backslashes in mount fields
+_MOUNT_UNESCAPE = re.compile(rb"\\(040|011|012|134)")
+_MOUNT_ESCAPES = {b"040": b" ", b"011": b"\t", b"012": b"\n", b"134": b"\\"}
+
+# Parsed mount tables keyed by path, reused while the raw table is unchanged
+_mount_cache: Dict[str, Tuple[bytes, List[Tuple[str, str, str]]]] = {}
 
 
 def _format_bytes(bytes_total: int) -> float:
-    return round(bytes_total / (1024 ** 3), 2)
+    return round(bytes_total * _GIB_INV, 2)
 
 
-def _should_include(mount_point: str, include: Sequence[str], exclude: Sequence[str]) -> bool:
-    if any(mount_point.startswith(prefix) for prefix in exclude):
-        return False
-    if not include:
+def _should_include(mount_point: str, disk_filter: re.Pattern[str] | None) -> bool:
+    if disk_filter is None:
         return True
-    return any(mount_point.startswith(prefix) for prefix in include)
+    match = disk_filter.match(mount_point)
+    return match is not None and match.lastgroup == "include"
 
 
-def _resolve_host_path(root: Path, mount_point: str) -> Path:
-    root_str = str(root)
-    # If mount_point already starts with the host root path, use it directly
-    if mount_point.startswith(root_str):
-        return Path(mount_point)
+def _resolve_host_path(config: Config, mount_point: str) -> str:
+    # If mount_point already lives under the host root path, use it directly
+    if mount_point == config.host_root_str or mount_point.startswith(config.host_root_prefix):
+        return mount_point
     if mount_point == "/":
-        return root
-    return root / mount_point.lstrip("/")
+        return config.host_root_str
+    return os.path.join(config.host_root_str, mount_point.lstrip("/"))
 
 
-def _decode_mount_field(value: str) -> str:
-    return value.replace("\\040", " ").replace("\\011", "\t")
+def _decode_mount_field(raw: bytes) -> str:
+    if b"\\" not in raw:
+        return raw.decode("utf-8")
+    return _MOUNT_UNESCAPE.sub(lambda match: _MOUNT_ESCAPES[match.group(1)], raw).decode("utf-8")
 
 
-def _parse_mounts_table(handle: Iterable[str]) -> List[Tuple[str, str, str]]:
+def _parse_mounts_table(data: bytes) -> List[Tuple[str, str, str]]:
     entries: List[Tuple[str, str, str]] = []
-    seen: set[str] = set()
-    for raw_line in handle:
-        parts = raw_line.split()
+    seen: set[Tuple[bytes, bytes]] = set()
+    for raw_line in data.splitlines():
+        parts = raw_line.split(None, 3)
         if len(parts) < 3:
             continue
         device, mount_point, fs_type = parts[:3]
-        key = f"{device}:{mount_point}"
+        key = (device, mount_point)
         if key in seen:
             continue
         seen.add(key)
-        if fs_type in _PSEUDO_FS_TYPES:
+        if fs_type in _PSEUDO_FS_TYPES_BYTES:
             continue
-        entries.append((device, mount_point, fs_type))
+        entries.append((device.decode("utf-8"), mount_point.decode("utf-8"), fs_type.decode("utf-8")))
     return entries
 
 
-def _parse_mountinfo_table(handle: Iterable[str]) -> List[Tuple[str, str, str]]:
+def _parse_mountinfo_table(data: bytes) -> List[Tuple[str, str, str]]:
     entries: List[Tuple[str, str, str]] = []
-    seen: set[str] = set()
-    for raw_line in handle:
+    seen: set[Tuple[bytes, bytes]] = set()
+    for raw_line in data.splitlines():
         parts = raw_line.split()
         if len(parts) < 10:
             continue
-        mount_point = _decode_mount_field(parts[4])
+        mount_point = parts[4]
         fs_type = parts[-3]
         source = parts[-2]
-        key = f"{source}:{mount_point}"
+        key = (source, mount_point)
         if key in seen:
             continue
         seen.add(key)
-        if fs_type in _PSEUDO_FS_TYPES:
+        if fs_type in _PSEUDO_FS_TYPES_BYTES:
             continue
-        entries.append((source, mount_point, fs_type))
+        entries.append(
+            (
+                source.decode("utf-8"),
+                _decode_mount_field(mount_point),
+                fs_type.decode("utf-8"),
+            )
+        )
     return entries
 
 
 def _load_mount_entries(config: Config) -> List[Tuple[str, str, str]]:
-    candidates: List[Tuple[str, Path, str]] = []
-    host_mounts = config.host_root_path / "proc" / "mounts"
+    candidates: List[Tuple[str, str, str]] = []
+    host_mounts = os.path.join(config.host_root_str, "proc", "mounts")
     candidates.append(("host_root", host_mounts, "mounts"))
 
-    candidates.append(("proc1", Path("/proc/1/mountinfo"), "mountinfo"))
-    candidates.append(("container", Path("/proc/mounts"), "mounts"))
+    candidates.append(("proc1", "/proc/1/mountinfo", "mountinfo"))
+    candidates.append(("container", "/proc/mounts", "mounts"))
 
     for label, path, table_type in candidates:
         if table_type == "mounts":
@@ -127,14 +170,22 @@ def _load_mount_entries(config: Config) -> List[Tuple[str, str, str]]:
             parser = _parse_mountinfo_table
 
         try:
-            with path.open("r", encoding="utf-8") as handle:
-                entries = parser(handle)
+            # procfs files are small and report st_size 0, so read them whole
+            with open(path, "rb") as handle:
+                data = handle.read()
         except FileNotFoundError:
             continue
         except PermissionError:
             logging.warning("Insufficient permission to read mount table %s", path)
             continue
 
+        cached = _mount_cache.get(path)
+        if cached is not None and cached[0] == data:
+            entries = cached[1]
+        else:
+            entries = parser(data)
+            _mount_cache[path] = (data, entries)
+
         if entries:
             if label != "host_root":
                 logging.debug("Using mount table %s for disk metrics", path)
@@ -144,75 +195,157 @@ def _load_mount_entries(config: Config) -> List[Tuple[str, str, str]]:
     return []
 
 
-def _display_mount_point(mount_point: str, host_root: Path) -> str:
+def _display_mount_point(mount_point: str, config: Config) -> str:
     """Strip host root prefix from mount point for cleaner display."""
-    root_str = str(host_root)
-    if mount_point.startswith(root_str) and mount_point != root_str:
-        stripped = mount_point[len(root_str):]
-        return stripped if stripped.startswith("/") else "/" + stripped
-    if mount_point == root_str:
+    if mount_point == config.host_root_str:
         return "/"
+    if mount_point.startswith(config.host_root_prefix):
+        return "/" + mount_point[len(config.host_root_prefix):]
     return mount_point
 
 
-def capture_disk_usage(config: Config) -> List[DiskSnapshot]:
-    snapshots: List[DiskSnapshot] = []
+def _probe_disk(path: str) -> Tuple[int, int, int, float] | None:
+    """Return (total, used, free, percent) for a directory, or None if path is missing or not one."""
+    try:
+        mode = os.stat(path).st_mode
+    except OSError as exc:
+        if exc.errno in _MISSING_PATH_ERRNOS:
+            return None
+        raise
+    if not stat.S_ISDIR(mode):
+        return None
+    return psutil.disk_usage(path)
+
+
+def _disk_probe_worker() -> None:
+    while True:
+        path, future = _disk_probe_queue.get()
+        try:
+            future.set_result(_probe_disk(path))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+def _submit_disk_probe(path: str) -> Future:
+    with _disk_probe_lock:
+        # Share a probe still in flight (a duplicate entry, a concurrent snapshot or a hung
+        # mount) rather than queueing the same path again
+        previous = _disk_probe_pending.get(path)
+        if previous is not None and not previous.done():
+            return previous
+        if not _disk_probe_threads:
+            for index in range(_DISK_PROBE_WORKERS):
+                worker = threading.Thread(target=_disk_probe_worker, name=f"disk-probe-{index}", daemon=True)
+                worker.start()
+                _disk_probe_threads.append(worker)
+        future: Future = Future()
+        _disk_probe_pending[path] = future
+        _disk_probe_queue.put((path, future))
+        return future
+
+
+def _batch_disk_usage(candidates: Sequence[Tuple[str, str]]) -> Dict[str, Tuple[int, int, int, float]]:
+    """Stat and measure every (mount point, host path) on the probe threads, keyed by host path."""
+    usages: Dict[str, Tuple[int, int, int, float]] = {}
+    futures: Dict[Future, Tuple[str, str]] = {}
+    for mount_point, host_path in candidates:
+        future = _submit_disk_probe(host_path)
+        # Results are keyed by host path, so one entry per shared probe is enough
+        futures.setdefault(future, (mount_point, host_path))
+    if not futures:
+        return usages
+
+    done, pending = wait(futures, timeout=_DISK_PROBE_TIMEOUT)
+    for future in done:
+        mount_point, host_path = futures[future]
+        try:
+            usage = future.result()
+        except FileNotFoundError:
+            logging.debug("Skipping mount %s because %s does not exist", mount_point, host_path)
+            continue
+        except PermissionError:
+            logging.debug("Skipping mount %s due to permission error", mount_point)
+            continue
+        except OSError as exc:
+            logging.debug("Skipping mount %s because %s could not be read: %s", mount_point, host_path, exc)
+            continue
+        if usage is None:
+            logging.debug("Skipping mount %s because %s is missing or not a directory", mount_point, host_path)
+            continue
+        usages[host_path] = usage
+    for future in pending:
+        mount_point, host_path = futures[future]
+        logging.warning("Skipping mount %s because %s timed out", mount_point, host_path)
+    return usages
+
+
+def _collect_disk_usage(config: Config) -> List[Tuple[str, str, str, Tuple[int, int, int, float]]]:
+    """Return (device, display mount point, filesystem, usage) for each eligible mount, sorted."""
     has_hostfs_root = False
     entries = list(_load_mount_entries(config))
 
     # Check if we have a hostfs root mount
-    root_str = str(config.host_root_path)
     for _, mount_point, _ in entries:
-        if mount_point == root_str or mount_point.startswith(root_str + "/"):
+        if mount_point == config.host_root_str or mount_point.startswith(config.host_root_prefix):
             has_hostfs_root = True
             break
 
+    candidates: List[Tuple[str, str, str, str]] = []
     for device, mount_point, fs_type in entries:
         # Skip bare root if hostfs root is present (avoids duplicate)
         if mount_point == "/" and has_hostfs_root:
             logging.debug("Skipping root mount / because hostfs root is present")
             continue
-        if not _should_include(mount_point, config.disk_include, config.disk_exclude):
+        if not _should_include(mount_point, config.disk_filter_re):
             logging.debug("Skipping mount %s due to include/exclude filters", mount_point)
             continue
 
-        host_path = _resolve_host_path(config.host_root_path, mount_point)
-        if not host_path.exists():
-            logging.debug("Skipping mount %s because %s does not exist", mount_point, host_path)
-            continue
+        candidates.append((device, mount_point, fs_type, _resolve_host_path(config, mount_point)))
 
-        if not host_path.is_dir():
-            logging.debug("Skipping mount %s because %s is not a directory", mount_point, host_path)
-            continue
+    usages = _batch_disk_usage([(mount_point, host_path) for _, mount_point, _, host_path in candidates])
 
-        try:
-            usage = psutil.disk_usage(str(host_path))
-        except PermissionError:
-            logging.debug("Skipping mount %s due to permission error", mount_point)
-            continue
-        except FileNotFoundError:
-            logging.debug("Skipping mount %s because path disappeared", mount_point)
-            continue
+    disks = [
+        (device, _display_mount_point(mount_point, config), fs_type, usages[host_path])
+        for device, mount_point, fs_type, host_path in candidates
+        if host_path in usages
+    ]
+    disks.sort(key=lambda disk: disk[1])
+    return disks
 
-        snapshots.append(
-            DiskSnapshot(
-                device=device,
-                mount_point=_display_mount_point(mount_point, config.host_root_path),
-                filesystem=fs_type,
-                total_gb=_format_bytes(usage.total),
-                used_gb=_format_bytes(usage.used),
-                free_gb=_format_bytes(usage.free),
-                used_percent=round(usage.percent, 2),
-            )
-        )
 
-    snapshots.sort(key=lambda snap: snap.mount_point)
-    return snapshots
+def capture_disk_rows(config: Config) -> List[Dict[str, object]]:
+    """Disk usage for each eligible mount as plain dicts, sorted by mount point."""
+    return [
+        {
+            "device": device,
+            "mount_point": mount_point,
+            "filesystem": fs_type,
+            "total_gb": _format_bytes(total),
+            "used_gb": _format_bytes(used),
+            "free_gb": _format_bytes(free),
+            "used_percent": round(percent, 2),
+        }
+        for device, mount_point, fs_type, (total, used, free, percent) in _collect_disk_usage(config)
+    ]
 
 
 def capture_cpu_stats() -> Dict[str, float]:
-    # First call with interval=None returns a meaningful instantaneous value without blocking longer than needed.
-    cpu_percent = psutil.cpu_percent(interval=0.25)
+    global _cpu_last_sample, _cpu_sampled_at
+    # Usage is averaged since the previous sample; only block when that window is too short to be meaningful.
+    with _cpu_lock:
+        elapsed = time.monotonic() - _cpu_sampled_at
+        if elapsed < _CPU_MIN_WINDOW:
+            time.sleep(_CPU_MIN_WINDOW - elapsed)
+        busy, total = _cpu_busy_total(psutil.cpu_times())
+        last_busy, last_total = _cpu_last_sample
+        _cpu_last_sample = (busy, total)
+        _cpu_sampled_at = time.monotonic()
+    busy_delta = busy - last_busy
+    total_delta = total - last_total
+    if total_delta <= 0:
+        cpu_percent = 0.0
+    else:
+        cpu_percent = min(max(busy_delta / total_delta * 100.0, 0.0), 100.0)
     load1, load5, load15 = os.getloadavg()
     return {
         "cpu_percent": round(cpu_percent, 2),
@@ -240,9 +373,7 @@ def capture_memory_stats() -> Dict[str, float]:
 
 
 def capture_uptime_stats() -> Dict[str, str | float]:
-    boot_time = datetime.fromtimestamp(psutil.boot_time(), tz=timezone.utc)
-    now = datetime.now(tz=timezone.utc)
-    uptime_seconds = (now - boot_time).total_seconds()
+    uptime_seconds = time.time() - _BOOT_TIME
 
     days, remainder = divmod(int(uptime_seconds), 86400)
     hours, remainder = divmod(remainder, 3600)
@@ -250,25 +381,25 @@ def capture_uptime_stats() -> Dict[str, str | float]:
     uptime_human = f"{days}d {hours}h {minutes}m" if days else f"{hours}h {minutes}m"
 
     return {
-        "boot_time_iso": boot_time.isoformat(),
+        "boot_time_iso": _BOOT_TIME_ISO,
         "uptime_seconds": uptime_seconds,
         "uptime_human": uptime_human,
     }
 
 
 def resolve_hostname(config: Config) -> str:
-    if config.host_label:
-        return config.host_label
-    return socket.gethostname()
+    return config.hostname
 
 
 def capture_snapshot(config: Config) -> Dict[str, object]:
+    timestamp = datetime.now(tz=timezone.utc)
     snapshot = {
         "cpu": capture_cpu_stats(),
         "memory": capture_memory_stats(),
         "uptime": capture_uptime_stats(),
         "hostname": resolve_hostname(config),
-        "timestamp_iso": datetime.now(tz=timezone.utc).isoformat(),
+        "timestamp_iso": timestamp.isoformat(),
+        "timestamp_dt": timestamp,
     }
-    snapshot["disks"] = [disk.__dict__ for disk in capture_disk_usage(config)]
+    snapshot["disks"] = capture_disk_rows(config)
     return snapshot
@@ -2,21 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
 import logging
 import os
+import re
+import socket
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Config:
     webhook_url: str
     username: str
     avatar_url: str | None
     cron_expression: str
     host_label: str | None
+    hostname: str
     host_root_path: Path
+    host_root_str: str
+    host_root_prefix: str
     disk_include: List[str]
     disk_exclude: List[str]
+    disk_filter_re: re.Pattern[str] | None
 
 
 def _split_csv(env_value: str | None) -> List[str]:
@@ -25,6 +31,22 @@ def _split_csv(env_value: str | None) -> List[str]:
     return [entry.strip() for entry in env_value.split(",") if entry.strip()]
 
 
+def _prefix_alternation(prefixes: Sequence[str]) -> str:
+    return "|".join(re.escape(prefix) for prefix in sorted(prefixes, key=len))
+
+
+def _compile_disk_filter(include: Sequence[str], exclude: Sequence[str]) -> re.Pattern[str] | None:
+    """Combine include/exclude prefixes into one pattern matched once per mount."""
+    if not include and not exclude:
+        return None
+    # Exclude is tried first; an empty include group matches everything when no includes are set
+    branches = []
+    if exclude:
+        branches.append(f"(?P<exclude>{_prefix_alternation(exclude)})")
+    branches.append(f"(?P<include>{_prefix_alternation(include)})")
+    return re.compile("|".join(branches))
+
+
 def load_config() -> Config:
     webhook_url = os.environ.get("DISCORD_WEBHOOK_URL", "").strip()
     if not webhook_url:
@@ -58,6 +80,9 @@ def load_config() -> Config:
     else:
         logging.warning("Could not resolve a valid host root path; using %s", explicit_path)
 
+    host_root_str = str(host_root_path)
+    host_root_prefix = host_root_str if host_root_str.endswith("/") else host_root_str + "/"
+
     disk_include = _split_csv(os.environ.get("DISK_INCLUDE"))
     disk_exclude = _split_csv(os.environ.get("DISK_EXCLUDE"))
 
@@ -67,7 +92,11 @@ def load_config() -> Config:
         avatar_url=avatar_url,
         cron_expression=cron_expression,
         host_label=host_label,
+        hostname=host_label or socket.gethostname(),
         host_root_path=host_root_path,
+        host_root_str=host_root_str,
+        host_root_prefix=host_root_prefix,
         disk_include=disk_include,
         disk_exclude=disk_exclude,
+        disk_filter_re=_compile_disk_filter(disk_include, disk_exclude),
     )
@@ -5,7 +5,6 @@ import os
 import signal
 import sys
 import threading
-import time
 from typing import Iterable, List
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -37,6 +36,12 @@ def _parse_cron_entries(raw_value: str) -> List[str]:
     return fragments or ["0 * * * *"]
 
 
+def _send_heartbeat(trigger_expression: str, config: Config, notifier: DiscordNotifier) -> None:
+    snapshot = capture_snapshot(config)
+    logging.debug("Dispatching heartbeat for cron '%s'", trigger_expression)
+    notifier.send("heartbeat", snapshot)
+
+
 def _register_jobs(scheduler: BackgroundScheduler, config: Config, notifier: DiscordNotifier) -> None:
     cron_entries = _parse_cron_entries(config.cron_expression)
     for cron_expression in cron_entries:
@@ -46,15 +51,10 @@ def _register_jobs(scheduler: BackgroundScheduler, config: Config, notifier: Dis
             logging.error("Invalid cron expression '%s': %s", cron_expression, exc)
             continue
 
-        def _job_wrapper(trigger_expression: str) -> None:
-            snapshot = capture_snapshot(config)
-            logging.debug("Dispatching heartbeat for cron '%s'", trigger_expression)
-            notifier.send("heartbeat", snapshot)
-
         scheduler.add_job(
-            func=_job_wrapper,
+            func=_send_heartbeat,
             trigger=trigger,
-            kwargs={"trigger_expression": cron_expression},
+            kwargs={"trigger_expression": cron_expression, "config": config, "notifier": notifier},
             name=f"heartbeat@{cron_expression}",
             misfire_grace_time=60,
             coalesce=True,
@@ -71,15 +71,6 @@ def main() -> None:
         logging.error("Configuration error: %s", exc)
         sys.exit(1)
 
-    notifier = DiscordNotifier(config)
-    scheduler = BackgroundScheduler(timezone="UTC")
-    _register_jobs(scheduler, config, notifier)
-
-    if not scheduler.get_jobs():
-        logging.error("No valid cron expressions registered; exiting")
-        notifier.close()
-        sys.exit(1)
-
     stop_event = threading.Event()
 
     def _handle_signal(signum: int, _: object) -> None:
@@ -89,6 +80,15 @@ def main() -> None:
     signal.signal(signal.SIGINT, _handle_signal)
     signal.signal(signal.SIGTERM, _handle_signal)
 
+    notifier = DiscordNotifier(config)
+    scheduler = BackgroundScheduler(timezone="UTC")
+    _register_jobs(scheduler, config, notifier)
+
+    if not scheduler.get_jobs():
+        logging.error("No valid cron expressions registered; exiting")
+        notifier.close()
+        sys.exit(1)
+
     startup_snapshot = capture_snapshot(config)
     notifier.send("startup", startup_snapshot)
 
@@ -96,8 +96,7 @@ def main() -> None:
     logging.info("Scheduler started with %d job(s)", len(scheduler.get_jobs()))
 
     try:
-        while not stop_event.is_set():
-            time.sleep(0.5)
+        stop_event.wait()
     finally:
         scheduler.shutdown(wait=False)
         shutdown_snapshot = capture_snapshot(config)
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, Iterable, List
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Set, Tuple
+import json
 import logging
 import os
-
-import requests
+import queue
+import string
+import threading
+import time
 
 from .config import Config
 
+if TYPE_CHECKING:
+    import requests
+
+try:
+    from orjson import dumps as _dumps_json
+except ImportError:
+    # Stdlib fallback for environments without the orjson wheel
+    def _dumps_json(payload: object) -> bytes:
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
 DEFAULT_EMBED_TEMPLATES = {
     "startup": {
         "title": "Moncord Online",
@@ -27,29 +40,175 @@ DEFAULT_EMBED_TEMPLATES = {
     },
 }
 
+# Override environment variables mapped to the (event, template key) they replace
+_TEMPLATE_OVERRIDE_VARS: Dict[str, Tuple[str, str]] = {
+    f"TEMPLATE_{event_key.upper()}{suffix}": (event_key, attribute)
+    for event_key in DEFAULT_EMBED_TEMPLATES
+    for suffix, attribute in (("", "description"), ("_TITLE", "title"), ("_COLOR", "color"))
+}
+
+
+class _TemplateContext(dict):
+    """Template values; unknown placeholders render verbatim instead of raising."""
+
+    def __missing__(self, key: str) -> str:
+        return f"{{{key}}}"
+
+
+# Fallbacks for metrics missing from a snapshot; captured values are merged over these
+_METRIC_DEFAULTS: Dict[str, object] = {
+    "cpu_percent": 0,
+    "load_1": 0,
+    "load_5": 0,
+    "load_15": 0,
+    "memory_percent": 0,
+    "memory_used_gb": 0,
+    "memory_total_gb": 0,
+    "memory_available_gb": 0,
+    "memory_cache_gb": 0,
+    "memory_buffers_gb": 0,
+    "memory_cached_gb": 0,
+    "uptime_human": "n/a",
+    "uptime_seconds": 0,
+    "boot_time_iso": "n/a",
+}
+
+_Formatter = Callable[[Dict[str, object]], str]
+
+_FIELD_CHUNK_SIZE = 1990
+
+_QUEUE_SIZE = 64
+_CLOSE_TIMEOUT = 10.0
+
 
 class DiscordNotifier:
+    # Fixed embed fields as (name, inline, value builder); disk fields are appended per send
+    _FIELD_SPECS: Tuple[Tuple[str, bool, _Formatter], ...] = (
+        (
+            "CPU",
+            True,
+            lambda c: f"Usage: {c['cpu_percent']}%\nLoad: {c['load_1']}/{c['load_5']}/{c['load_15']}",
+        ),
+        (
+            "Memory",
+            True,
+            lambda c: (
+                f"Usage: {c['memory_percent']}%\n"
+                f"{c['memory_used_gb']}/{c['memory_total_gb']} GiB\n"
+                f"Cache: {c['memory_cache_gb']} GiB"
+            ),
+        ),
+        ("Uptime", True, lambda c: c["uptime_human"]),
+        ("Cron", False, lambda c: f"`{c['cron_display']}`"),
+    )
+
     def __init__(self, config: Config) -> None:
         self._config = config
-        self._session = requests.Session()
+        # Local zone name when the process runs in fixed UTC, enabling the timestamp fast path
+        self._utc_tzname = time.tzname[0] if time.timezone == 0 and not time.daylight else None
+        self._cron_display = ", ".join(
+            entry.strip()
+            for entry in config.cron_expression.replace(";", "\n").splitlines()
+            if entry.strip()
+        ) or config.cron_expression
+        self._payload_base: Dict[str, object] = {"username": config.username}
+        if config.avatar_url:
+            self._payload_base["avatar_url"] = config.avatar_url
+        # requests is imported and the session built on the first delivery, keeping startup light
+        self._http: Tuple[requests.Session, requests.PreparedRequest, Dict[str, object]] | None = None
+        # Filled in once requests is imported; an empty tuple catches nothing before then
+        self._request_errors: Tuple[type[Exception], ...] = ()
         self._templates = {key: value.copy() for key, value in DEFAULT_EMBED_TEMPLATES.items()}
+        # Reused fixed-field dicts; safe because only the delivery worker builds embeds and
+        # each payload is serialised before the next one is built
+        self._field_pool: List[Dict[str, object]] = [
+            {"name": name, "value": "", "inline": inline} for name, inline, _ in self._FIELD_SPECS
+        ]
+        self._compiled: Dict[str, Tuple[_Formatter, _Formatter]] = {}
+        self._needs_disks_block: Set[str] = set()
         self._load_template_overrides()
+        # Deliveries run on a background thread so a slow webhook never stalls the scheduler
+        self._queue: queue.Queue[Tuple[str, Dict[str, object]] | None] = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._worker = threading.Thread(target=self._drain, name="discord-notifier", daemon=True)
+        self._worker.start()
+
+    def _ensure_session(self) -> Tuple[requests.Session, requests.PreparedRequest, Dict[str, object]]:
+        if self._http is not None:
+            return self._http
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self._request_errors = (requests.RequestException,)
+        session = requests.Session()
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        # One long-lived keep-alive connection to Discord, shared by the single delivery worker
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retries))
+        # URL, headers and environment settings never change; only the body differs per post
+        webhook_url = self._config.webhook_url
+        try:
+            prepared = session.prepare_request(
+                requests.Request("POST", webhook_url, headers={"Content-Type": "application/json"})
+            )
+            send_settings = session.merge_environment_settings(webhook_url, {}, None, None, None)
+        except Exception:
+            session.close()
+            raise
+        self._http = (session, prepared, send_settings)
+        return self._http
 
     def _load_template_overrides(self) -> None:
-        for event_key in self._templates.keys():
-            base = event_key.upper()
-            description_override = os.environ.get(f"TEMPLATE_{base}")
-            title_override = os.environ.get(f"TEMPLATE_{base}_TITLE")
-            color_override = os.environ.get(f"TEMPLATE_{base}_COLOR")
-
-            if description_override:
-                self._templates[event_key]["description"] = description_override
-            if title_override:
-                self._templates[event_key]["title"] = title_override
-            if color_override:
-                parsed = self._parse_color(color_override)
+        for env_name, (event_key, attribute) in _TEMPLATE_OVERRIDE_VARS.items():
+            override = os.environ.get(env_name)
+            if not override:
+                continue
+            if attribute == "color":
+                parsed = self._parse_color(override)
                 if parsed is not None:
                     self._templates[event_key]["color"] = parsed
+            else:
+                self._templates[event_key][attribute] = override
+
+        for event_key in self._templates:
+            self._compile_template(event_key)
+
+    def _compile_template(self, event_key: str) -> None:
+        template = self._templates[event_key]
+        self._compiled[event_key] = (
+            self._compile_format(template["title"]),
+            self._compile_format(template["description"]),
+        )
+        # Only join the disks block for events whose templates can reference it
+        if "disks_block" in template["title"] or "disks_block" in template["description"]:
+            self._needs_disks_block.add(event_key)
+        else:
+            self._needs_disks_block.discard(event_key)
+
+    @staticmethod
+    def _compile_format(text: str) -> _Formatter:
+        # Parse the format string once; plain {name} fields become a literal/lookup join
+        parts: List[Tuple[str, str | None]] = []
+        try:
+            for literal, field_name, format_spec, conversion in string.Formatter().parse(text):
+                if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+                    # Specs, conversions and attribute/index access keep using str.format
+                    return text.format_map
+                parts.append((literal, field_name))
+        except ValueError:
+            # Malformed template; let format_map raise at send time as before
+            return text.format_map
+
+        compiled = tuple(parts)
+        return lambda context: "".join(
+            literal + str(context[field]) if field else literal for literal, field in compiled
+        )
 
     @staticmethod
     def _parse_color(raw_value: str | None) -> int | None:
@@ -65,100 +224,123 @@ class DiscordNotifier:
             return None
         return max(0, min(value, 0xFFFFFF))
 
-    @staticmethod
-    def _chunk_text(text: str, size: int = 1000) -> Iterable[str]:
-        if len(text) <= size:
-            yield text
-            return
-        start = 0
-        while start < len(text):
-            yield text[start : start + size]
-            start += size
-
     def _build_disks_block(self, snapshot: Dict[str, object]) -> List[str]:
         disks = snapshot.get("disks", [])
         if not disks:
             return ["```\nNo eligible disks\n```"]
 
-        # Filter out EFI partitions
-        disks = [d for d in disks if "/efi" not in d["mount_point"].lower()]
-        if not disks:
+        # Filter out EFI partitions, pulling each disk's fields out once
+        rows = [
+            (d["mount_point"], f"{d['used_gb']}/{d['total_gb']} GiB", d["used_percent"])
+            for d in disks
+            if "/efi" not in d["mount_point"].lower()
+        ]
+        if not rows:
             return ["```\nNo eligible disks\n```"]
 
         # Calculate column widths
-        mount_width = max(len("MOUNT"), max(len(d["mount_point"]) for d in disks))
-        used_width = max(len("USED"), max(len(f"{d['used_gb']}/{d['total_gb']} GiB") for d in disks))
+        mount_width = max(len("MOUNT"), max(len(mount) for mount, _, _ in rows))
+        used_width = max(len("USED"), max(len(used) for _, used, _ in rows))
 
         # Build header
         header = f"{'MOUNT':<{mount_width}}  {'USED':>{used_width}}  {'%':>5}"
         separator = "-" * len(header)
 
-        lines = [header, separator]
-        for disk in disks:
-            used_str = f"{disk['used_gb']}/{disk['total_gb']} GiB"
-            pct_str = f"{disk['used_percent']:>5.1f}"
-            lines.append(f"{disk['mount_point']:<{mount_width}}  {used_str:>{used_width}}  {pct_str}")
+        # Column widths are fixed per table, so bind one positional formatter for every row
+        format_row = f"{{:<{mount_width}}}  {{:>{used_width}}}  {{:>5.1f}}".format
+        lines = "\n".join([format_row(*row) for row in rows])
+
+        text = f"```\n{header}\n{separator}\n{lines}\n```"
+        return [text[start : start + _FIELD_CHUNK_SIZE] for start in range(0, len(text), _FIELD_CHUNK_SIZE)]
 
-        text = "```\n" + "\n".join(lines) + "\n```"
-        return list(self._chunk_text(text, size=1990))
+    def _format_local_timestamp(self, timestamp: datetime) -> str:
+        # Containers usually run in UTC, where snapshot timestamps are already local
+        if self._utc_tzname is not None and timestamp.utcoffset() == timedelta(0):
+            return (
+                f"{timestamp.year:04d}-{timestamp.month:02d}-{timestamp.day:02d} "
+                f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d} {self._utc_tzname}"
+            )
+        return timestamp.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
 
     def _build_context(self, event: str, snapshot: Dict[str, object]) -> Dict[str, object]:
         timestamp_iso = snapshot.get("timestamp_iso")
-        timestamp = datetime.fromisoformat(timestamp_iso) if timestamp_iso else datetime.now()
-        timestamp_local = timestamp.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
-
-        cpu = snapshot.get("cpu", {})
-        memory = snapshot.get("memory", {})
-        uptime = snapshot.get("uptime", {})
+        timestamp = snapshot.get("timestamp_dt")
+        if timestamp is None:
+            timestamp = datetime.fromisoformat(timestamp_iso) if timestamp_iso else datetime.now()
+        timestamp_local = self._format_local_timestamp(timestamp)
 
-        cron_display = ", ".join(
-            entry.strip()
-            for entry in self._config.cron_expression.replace(";", "\n").splitlines()
-            if entry.strip()
-        ) or self._config.cron_expression
-
-        context = {
-            "hostname": snapshot.get("hostname", "unknown"),
-            "timestamp_iso": timestamp_iso,
-            "timestamp_local": timestamp_local,
-            "cron_expression": self._config.cron_expression,
-            "cron_display": cron_display,
-            "cpu_percent": cpu.get("cpu_percent", 0),
-            "load_1": cpu.get("load_1", 0),
-            "load_5": cpu.get("load_5", 0),
-            "load_15": cpu.get("load_15", 0),
-            "memory_percent": memory.get("memory_percent", 0),
-            "memory_used_gb": memory.get("memory_used_gb", 0),
-            "memory_total_gb": memory.get("memory_total_gb", 0),
-            "memory_available_gb": memory.get("memory_available_gb", 0),
-            "memory_cache_gb": memory.get("memory_cache_gb", 0),
-            "memory_buffers_gb": memory.get("memory_buffers_gb", 0),
-            "memory_cached_gb": memory.get("memory_cached_gb", 0),
-            "uptime_human": uptime.get("uptime_human", "n/a"),
-            "disks_chunks": self._build_disks_block(snapshot),
-        }
-        context["disks_block"] = "\n".join(context["disks_chunks"]) if context["disks_chunks"] else ""
+        context = _TemplateContext(
+            {
+                **_METRIC_DEFAULTS,
+                **snapshot.get("cpu", {}),
+                **snapshot.get("memory", {}),
+                **snapshot.get("uptime", {}),
+                "hostname": snapshot.get("hostname", "unknown"),
+                "timestamp_iso": timestamp_iso,
+                "timestamp_local": timestamp_local,
+                "cron_expression": self._config.cron_expression,
+                "cron_display": self._cron_display,
+                "disks_chunks": self._build_disks_block(snapshot),
+            }
+        )
+        if event in self._needs_disks_block:
+            context["disks_block"] = "\n".join(context["disks_chunks"])
         return context
 
     def send(self, event: str, snapshot: Dict[str, object]) -> None:
-        template = self._templates.get(event)
-        if not template:
+        if event not in self._templates:
             logging.warning("No template configured for event %s", event)
             return
 
+        try:
+            self._queue.put_nowait((event, snapshot))
+        except queue.Full:
+            logging.warning("Notification queue is full; dropping %s event", event)
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in self._coalesce(batch):
+                if item is None:
+                    return
+                event, snapshot = item
+                try:
+                    self._deliver(event, snapshot)
+                except Exception:
+                    logging.exception("Failed to deliver %s event", event)
+
+    @staticmethod
+    def _coalesce(
+        batch: List[Tuple[str, Dict[str, object]] | None],
+    ) -> List[Tuple[str, Dict[str, object]] | None]:
+        # A backlog of heartbeats only needs the newest one; other events keep their order
+        heartbeats = [index for index, item in enumerate(batch) if item is not None and item[0] == "heartbeat"]
+        if len(heartbeats) <= 1:
+            return batch
+        logging.debug("Coalescing %d queued heartbeats into the newest one", len(heartbeats))
+        stale = set(heartbeats[:-1])
+        return [item for index, item in enumerate(batch) if index not in stale]
+
+    def _deliver(self, event: str, snapshot: Dict[str, object]) -> None:
+        template = self._templates[event]
         context = self._build_context(event, snapshot)
         embed = self._build_embed(event, template, context)
 
-        payload = {
-            "username": self._config.username,
-            "embeds": [embed],
-        }
-        if self._config.avatar_url:
-            payload["avatar_url"] = self._config.avatar_url
+        payload = self._payload_base.copy()
+        payload["embeds"] = [embed]
 
         try:
-            response = self._session.post(self._config.webhook_url, json=payload, timeout=10)
-        except requests.RequestException as exc:
+            session, prepared, send_settings = self._ensure_session()
+            request = prepared.copy()
+            request.prepare_body(data=_dumps_json(payload), files=None)
+            response = session.send(request, timeout=10, **send_settings)
+        except self._request_errors as exc:
             logging.error("Failed to send Discord webhook: %s", exc)
             return
 
@@ -166,51 +348,29 @@ class DiscordNotifier:
             logging.error("Discord webhook rejected message with status %s: %s", response.status_code, response.text)
 
     def close(self) -> None:
-        self._session.close()
+        # Let queued events (e.g. the shutdown notice) go out before tearing down the session,
+        # bounding the whole wait even if the worker is stuck behind a slow or rate-limited post
+        deadline = time.monotonic() + _CLOSE_TIMEOUT
+        try:
+            self._queue.put(None, timeout=_CLOSE_TIMEOUT)
+        except queue.Full:
+            logging.warning("Timed out waiting for pending Discord notifications")
+        else:
+            self._worker.join(timeout=max(0.0, deadline - time.monotonic()))
+            if self._worker.is_alive():
+                logging.warning("Timed out waiting for pending Discord notifications")
+        if self._http is not None:
+            self._http[0].close()
 
     def _build_embed(self, event: str, template: Dict[str, object], context: Dict[str, object]) -> Dict[str, object]:
-        title = template.get("title", "Moncord").format(**context)
-        description = template.get("description", "").format(**context)
-        color = template.get("color")
+        format_title, format_description = self._compiled[event]
+        title = format_title(context)
+        description = format_description(context)
+        color = template["color"]
 
-        fields: List[Dict[str, object]] = []
-
-        fields.append(
-            {
-                "name": "CPU",
-                "value": (
-                    f"Usage: {context['cpu_percent']}%\n"
-                    f"Load: {context['load_1']}/{context['load_5']}/{context['load_15']}"
-                ),
-                "inline": True,
-            }
-        )
-        fields.append(
-            {
-                "name": "Memory",
-                "value": (
-                    f"Usage: {context['memory_percent']}%\n"
-                    f"{context['memory_used_gb']}/{context['memory_total_gb']} GiB\n"
-                    f"Cache: {context['memory_cache_gb']} GiB"
-                ),
-                "inline": True,
-            }
-        )
-        fields.append(
-            {
-                "name": "Uptime",
-                "value": context["uptime_human"],
-                "inline": True,
-            }
-        )
-
-        fields.append(
-            {
-                "name": "Cron",
-                "value": f"`{context['cron_display']}`",
-                "inline": False,
-            }
-        )
+        for field, (_, _, build_value) in zip(self._field_pool, self._FIELD_SPECS):
+            field["value"] = build_value(context)
+        fields: List[Dict[str, object]] = list(self._field_pool)
 
         disk_chunks = context.get("disks_chunks", []) or ["No eligible disks"]
         for index, chunk in enumerate(disk_chunks, start=1):
@@ -233,7 +393,7 @@ class DiscordNotifier:
         if timestamp_iso:
             embed["timestamp"] = timestamp_iso
 
-        if isinstance(color, int):
+        if color is not None:
             embed["color"] = color
 
         embed["footer"] = {"text": context.get("hostname", "Moncord")}